@@ -45,6 +45,8 @@ from .const import (
 
 DESCRIPTION_PLACEHOLDERS = {"api_key_url": "https://www.perplexity.ai/account/api/keys"}
 
+STEP_API_KEY_DATA_SCHEMA = vol.Schema({vol.Required(CONF_API_KEY): str})
+
 
 class PerplexityConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Perplexity."""
@@ -103,11 +105,7 @@ class PerplexityConfigFlow(ConfigFlow, domain=DOMAIN):
                 )
         return self.async_show_form(
             step_id="user",
-            data_schema=vol.Schema(
-                {
-                    vol.Required(CONF_API_KEY): str,
-                }
-            ),
+            data_schema=STEP_API_KEY_DATA_SCHEMA,
             errors=errors,
             description_placeholders=DESCRIPTION_PLACEHOLDERS,
         )
@@ -135,7 +133,7 @@ class PerplexityConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="reauth_confirm",
-            data_schema=vol.Schema({vol.Required(CONF_API_KEY): str}),
+            data_schema=STEP_API_KEY_DATA_SCHEMA,
             errors=errors,
             description_placeholders=DESCRIPTION_PLACEHOLDERS,
         )
@@ -156,7 +154,7 @@ class PerplexityConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="reconfigure",
-            data_schema=vol.Schema({vol.Required(CONF_API_KEY): str}),
+            data_schema=STEP_API_KEY_DATA_SCHEMA,
             errors=errors,
             description_placeholders=DESCRIPTION_PLACEHOLDERS,
         )
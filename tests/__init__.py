@@ -1 +1,27 @@
 """Tests for the Perplexity integration."""
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+ENTITY_ENTRY_EXCLUDED_KEYS = frozenset(
+    {
+        "area_id",
+        "categories",
+        "config_entry_id",
+        "created_at",
+        "device_id",
+        "hidden_by",
+        "id",
+        "labels",
+        "modified_at",
+    }
+)
+STATE_EXCLUDED_KEYS = frozenset(
+    {"context", "last_changed", "last_reported", "last_updated"}
+)
+
+
+async def setup_integration(hass: HomeAssistant, config_entry: MockConfigEntry) -> None:
+    """Set up the Perplexity integration for testing."""
+    await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
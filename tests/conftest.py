@@ -1,20 +1,39 @@
 """Tests helpers for the Perplexity integration."""
 
-from collections.abc import AsyncGenerator, Callable, Generator
+from collections.abc import AsyncGenerator, Callable
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, create_autospec
 
 import pytest
 from homeassistant.components.conversation.const import DOMAIN as CONVERSATION_DOMAIN
-from homeassistant.const import CONF_API_KEY, CONF_LLM_HASS_API, CONF_MODEL
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_LLM_HASS_API,
+    CONF_MODEL,
+    SERVICE_TURN_OFF,
+    SERVICE_TURN_ON,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.setup import async_setup_component
+from perplexity import AsyncPerplexity
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 from syrupy.assertion import SnapshotAssertion
 from syrupy.extensions.amber import AmberSnapshotExtension
 from syrupy.location import PyTestLocation
 
+from custom_components import perplexity as perplexity_integration
+from custom_components.perplexity import config_flow
 from custom_components.perplexity.const import CONF_PROMPT, DOMAIN
+from tests import setup_integration
+
+# Minimal 1x1 pixel PNG image
+PNG_BYTES = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
+    b"\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx"
+    b"\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82"
+)
 
 
 @pytest.fixture(autouse=True)
@@ -64,18 +83,27 @@ def mock_config_entry(hass: HomeAssistant) -> MockConfigEntry:
     return entry
 
 
+@pytest.fixture(scope="session")
+def session_perplexity_client() -> MagicMock:
+    """Return a Perplexity client mock shared by all tests."""
+    client = create_autospec(AsyncPerplexity, instance=True)
+    # `chat` is a cached property, so autospec can't introspect it
+    client.chat = MagicMock()
+    client.chat.completions.create = AsyncMock()
+    return client
+
+
 @pytest.fixture
-def mock_perplexity_client() -> Generator[MagicMock]:
+def mock_perplexity_client(
+    monkeypatch: pytest.MonkeyPatch, session_perplexity_client: MagicMock
+) -> MagicMock:
     """Mock the Perplexity client."""
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity", autospec=True
-    ) as mock_client:
-        client = mock_client.return_value
-        client.platform_headers = MagicMock(return_value={})
-        client.chat = MagicMock()
-        client.chat.completions = MagicMock()
-        client.chat.completions.create = AsyncMock(return_value=MagicMock())
-        yield client
+    client = session_perplexity_client
+    client.reset_mock(return_value=True, side_effect=True)
+    client.platform_headers.return_value = {}
+    for module in (perplexity_integration, config_flow):
+        monkeypatch.setattr(module, "AsyncPerplexity", lambda **_: client)
+    return client
 
 
 @pytest.fixture
@@ -85,46 +113,73 @@ async def mock_setup_entry(
     mock_perplexity_client: MagicMock,
 ) -> MockConfigEntry:
     """Set up the Perplexity integration for testing."""
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
-        await hass.async_block_till_done()
+    await setup_integration(hass, mock_config_entry)
+    assert mock_config_entry.state is ConfigEntryState.LOADED
     return mock_config_entry
 
 
+@pytest.fixture
+def mock_loaded_entry(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> MockConfigEntry:
+    """Mock a loaded config entry without setting up the integration."""
+    mock_config_entry.mock_state(hass, ConfigEntryState.LOADED)
+    return mock_config_entry
+
+
+@pytest.fixture
+def mock_lights(hass: HomeAssistant) -> None:
+    """Mock light states."""
+    hass.states.async_set("light.living_room", "off")
+    hass.states.async_set("light.bedroom", "off")
+
+
+@pytest.fixture
+def light_service_calls(hass: HomeAssistant) -> list[ServiceCall]:
+    """Track calls to the light services."""
+    calls: list[ServiceCall] = []
+
+    @callback
+    def _async_record_call(call: ServiceCall) -> None:
+        calls.append(call)
+
+    for service in (SERVICE_TURN_OFF, SERVICE_TURN_ON):
+        hass.services.async_register("light", service, _async_record_call)
+    return calls
+
+
 @pytest.fixture
 def snapshot(snapshot: SnapshotAssertion) -> SnapshotAssertion:
     """Return snapshot assertion fixture."""
     return snapshot.use_extension(SnapshotExtension)
 
 
-async def mock_stream_response(content: str) -> AsyncGenerator[MagicMock]:
-    """Create a mock stream response."""
-    mock_chunk = MagicMock()
-    mock_chunk.choices = [MagicMock()]
-    mock_chunk.choices[0].delta = MagicMock()
-    mock_chunk.choices[0].delta.content = content
-    yield mock_chunk
+def mock_stream_chunk(content: str) -> SimpleNamespace:
+    """Return a stream chunk with the given content."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=content))]
+    )
 
 
-def create_mock_stream(content: str) -> AsyncGenerator[MagicMock]:
+async def create_mock_stream(content: str) -> AsyncGenerator[SimpleNamespace]:
     """Create a mock stream for the given content."""
+    yield mock_stream_chunk(content)
 
-    async def _stream() -> AsyncGenerator[MagicMock]:
-        async for chunk in mock_stream_response(content):
-            yield chunk
 
-    return _stream()
-
-
-@pytest.fixture
-def mock_stream() -> Callable[[str], AsyncGenerator[MagicMock]]:
+@pytest.fixture(scope="session")
+def mock_stream() -> Callable[[str], AsyncGenerator[SimpleNamespace]]:
     """Mock stream fixture."""
     return create_mock_stream
 
 
+@pytest.fixture(scope="session")
+def tiny_png(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Return the path of a minimal PNG image."""
+    path = tmp_path_factory.mktemp("images") / "test.png"
+    path.write_bytes(PNG_BYTES)
+    return path
+
+
 class SnapshotExtension(AmberSnapshotExtension):
     """Extension for Syrupy."""
 
@@ -2,7 +2,7 @@
 
 from collections.abc import Callable
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 import voluptuous as vol
@@ -15,8 +15,14 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 from syrupy.assertion import SnapshotAssertion
 
 from custom_components.perplexity.const import CONF_WEB_SEARCH, DOMAIN
+from tests import (
+    ENTITY_ENTRY_EXCLUDED_KEYS,
+    STATE_EXCLUDED_KEYS,
+    setup_integration,
+)
 
 
+@pytest.mark.snapshot
 async def test_ai_task_entity(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
@@ -24,15 +30,8 @@ async def test_ai_task_entity(
     snapshot: SnapshotAssertion,
 ) -> None:
     """Test AI task entity."""
-    with (
-        patch(
-            "custom_components.perplexity.AsyncPerplexity",
-            return_value=mock_perplexity_client,
-        ),
-        patch("custom_components.perplexity.PLATFORMS", [Platform.AI_TASK]),
-    ):
+    with patch("custom_components.perplexity.PLATFORMS", [Platform.AI_TASK]):
         assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
-        await hass.async_block_till_done()
 
     entity_registry = er.async_get(hass)
 
@@ -43,25 +42,22 @@ async def test_ai_task_entity(
     assert len(entity_entries) == 1
 
     for entity_entry in entity_entries:
-        entity_entry_dict = entity_entry.as_partial_dict
-        for item in (
-            "area_id",
-            "categories",
-            "config_entry_id",
-            "created_at",
-            "device_id",
-            "hidden_by",
-            "id",
-            "labels",
-            "modified_at",
-        ):
-            entity_entry_dict.pop(item)
+        entity_entry_dict = {
+            key: value
+            for key, value in entity_entry.as_partial_dict.items()
+            if key not in ENTITY_ENTRY_EXCLUDED_KEYS
+        }
         assert entity_entry_dict == snapshot(name=f"{entity_entry.entity_id}-entry")
 
-        state = hass.states.get(entity_entry.entity_id)._as_dict
-        for item in ("context", "last_changed", "last_reported", "last_updated"):
-            state.pop(item)
-        assert state == snapshot(name=f"{entity_entry.entity_id}-state")
+        state = hass.states.get(entity_entry.entity_id)
+        assert state is not None
+
+        state_dict = {
+            key: value
+            for key, value in state._as_dict.items()
+            if key not in STATE_EXCLUDED_KEYS
+        }
+        assert state_dict == snapshot(name=f"{entity_entry.entity_id}-state")
 
 
 async def test_ai_task_generate_data_without_structure(
@@ -71,8 +67,8 @@ async def test_ai_task_generate_data_without_structure(
     mock_stream: Callable[[str], Any],
 ) -> None:
     """Test AI task generate data without structure."""
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("Test response")
+    mock_perplexity_client.chat.completions.create.return_value = mock_stream(
+        "Test response"
     )
 
     result = await ai_task.async_generate_data(
@@ -92,8 +88,8 @@ async def test_ai_task_generate_data_with_structure(
     mock_stream: Callable[[str], Any],
 ) -> None:
     """Test AI task generate data with structure."""
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream('{"key": "value"}')
+    mock_perplexity_client.chat.completions.create.return_value = mock_stream(
+        '{"key": "value"}'
     )
 
     result = await ai_task.async_generate_data(
@@ -114,8 +110,8 @@ async def test_ai_task_generate_data_invalid_json(
     mock_stream: Callable[[str], Any],
 ) -> None:
     """Test AI task generate data with invalid JSON response."""
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("invalid json")
+    mock_perplexity_client.chat.completions.create.return_value = mock_stream(
+        "invalid json"
     )
 
     with pytest.raises(
@@ -137,8 +133,8 @@ async def test_ai_task_web_search_disabled_by_default(
     mock_stream: Callable[[str], Any],
 ) -> None:
     """Test AI task has web search disabled by default."""
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("Test response")
+    mock_perplexity_client.chat.completions.create.return_value = mock_stream(
+        "Test response"
     )
 
     await ai_task.async_generate_data(
@@ -174,15 +170,10 @@ async def test_ai_task_web_search_enabled(
     )
     entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+    await setup_integration(hass, entry)
 
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("Test response with web search")
+    mock_perplexity_client.chat.completions.create.return_value = mock_stream(
+        "Test response with web search"
     )
 
     result = await ai_task.async_generate_data(
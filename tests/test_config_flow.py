@@ -1,8 +1,16 @@
 """Tests for the Perplexity config flow."""
 
-from unittest.mock import MagicMock, Mock, patch
-
-from homeassistant.config_entries import SOURCE_USER
+from typing import Any
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from homeassistant.config_entries import (
+    SOURCE_REAUTH,
+    SOURCE_RECONFIGURE,
+    SOURCE_USER,
+    ConfigEntry,
+    ConfigFlowResult,
+)
 from homeassistant.const import CONF_API_KEY, CONF_LLM_HASS_API, CONF_MODEL, CONF_PROMPT
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
@@ -10,7 +18,10 @@ from homeassistant.helpers import llm
 from perplexity import AuthenticationError, PerplexityError
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.perplexity.config_flow import PerplexityConfigFlow
+from custom_components.perplexity.config_flow import (
+    PerplexityConfigFlow,
+    PerplexityConversationFlowHandler,
+)
 from custom_components.perplexity.const import (
     CONF_REASONING_EFFORT,
     CONF_WEB_SEARCH,
@@ -18,6 +29,34 @@ from custom_components.perplexity.const import (
 )
 
 
+async def _async_start_flow(
+    hass: HomeAssistant, entry: MockConfigEntry, source: str
+) -> ConfigFlowResult:
+    """Start a reauth or reconfigure flow for the given entry."""
+    if source == SOURCE_REAUTH:
+        return await entry.start_reauth_flow(hass)
+    return await entry.start_reconfigure_flow(hass)
+
+
+async def _async_create_subentry(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    subentry_type: str,
+    user_input: dict[str, Any],
+) -> str:
+    """Create a subentry through the subentry flow and return its ID."""
+    result = await hass.config_entries.subentries.async_init(
+        (entry.entry_id, subentry_type), context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.subentries.async_configure(
+        result["flow_id"], user_input=user_input
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+
+    # The new subentry is the last one added to the entry
+    return next(reversed(entry.subentries))
+
+
 async def test_user_flow_success(
     hass: HomeAssistant,
     mock_perplexity_client: MagicMock,
@@ -29,96 +68,111 @@ async def test_user_flow_success(
     assert result["type"] is FlowResultType.FORM
     assert result["step_id"] == "user"
 
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "test_api_key"},
-        )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_API_KEY: "test_api_key"},
+    )
 
     assert result["type"] is FlowResultType.CREATE_ENTRY
     assert result["title"] == "Perplexity"
     assert result["data"] == {CONF_API_KEY: "test_api_key"}
 
 
-async def test_user_flow_invalid_auth(
+@pytest.mark.parametrize(
+    ("source", "step_id", "reason"),
+    [
+        (SOURCE_REAUTH, "reauth_confirm", "reauth_successful"),
+        (SOURCE_RECONFIGURE, "reconfigure", "reconfigure_successful"),
+    ],
+)
+async def test_flow_success(
     hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
     mock_perplexity_client: MagicMock,
+    source: str,
+    step_id: str,
+    reason: str,
 ) -> None:
-    """Test user flow with invalid auth."""
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": SOURCE_USER}
-    )
-
-    mock_perplexity_client.chat.completions.create.side_effect = AuthenticationError(
-        "Invalid API key", response=Mock(), body=None
-    )
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "invalid_key"},
-        )
-
+    """Test successful reauth and reconfigure flows."""
+    result = await _async_start_flow(hass, mock_config_entry, source)
     assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "invalid_auth"}
+    assert result["step_id"] == step_id
 
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_API_KEY: "new_api_key"},
+    )
 
-async def test_user_flow_cannot_connect(
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == reason
+    assert mock_config_entry.data == {CONF_API_KEY: "new_api_key"}
+
+
+@pytest.mark.parametrize(
+    ("exception", "error"),
+    [
+        (
+            AuthenticationError("Invalid API key", response=Mock(), body=None),
+            "invalid_auth",
+        ),
+        (PerplexityError("Connection error"), "cannot_connect"),
+        (RuntimeError("Unknown error"), "unknown"),
+    ],
+)
+async def test_user_flow_errors(
     hass: HomeAssistant,
     mock_perplexity_client: MagicMock,
+    exception: Exception,
+    error: str,
 ) -> None:
-    """Test user flow with connection error."""
+    """Test user flow with errors."""
     result = await hass.config_entries.flow.async_init(
         DOMAIN, context={"source": SOURCE_USER}
     )
 
-    mock_perplexity_client.chat.completions.create.side_effect = PerplexityError(
-        "Connection error"
-    )
+    mock_perplexity_client.chat.completions.create.side_effect = exception
 
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "test_api_key"},
-        )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_API_KEY: "test_api_key"},
+    )
 
     assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "cannot_connect"}
-
-
-async def test_user_flow_unknown_error(
+    assert result["errors"] == {"base": error}
+
+
+@pytest.mark.parametrize("source", [SOURCE_REAUTH, SOURCE_RECONFIGURE])
+@pytest.mark.parametrize(
+    ("exception", "error"),
+    [
+        (
+            AuthenticationError("Invalid API key", response=Mock(), body=None),
+            "invalid_auth",
+        ),
+        (PerplexityError("Connection error"), "cannot_connect"),
+        (RuntimeError("Unknown error"), "unknown"),
+    ],
+)
+async def test_flow_errors(
     hass: HomeAssistant,
+    mock_config_entry: MockConfigEntry,
     mock_perplexity_client: MagicMock,
+    source: str,
+    exception: Exception,
+    error: str,
 ) -> None:
-    """Test user flow with unknown error."""
-    result = await hass.config_entries.flow.async_init(
-        DOMAIN, context={"source": SOURCE_USER}
-    )
+    """Test reauth and reconfigure flows with errors."""
+    result = await _async_start_flow(hass, mock_config_entry, source)
 
-    mock_perplexity_client.chat.completions.create.side_effect = RuntimeError(
-        "Unknown error"
-    )
+    mock_perplexity_client.chat.completions.create.side_effect = exception
 
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "test_api_key"},
-        )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        user_input={CONF_API_KEY: "new_api_key"},
+    )
 
     assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "unknown"}
+    assert result["errors"] == {"base": error}
 
 
 async def test_user_flow_already_configured(
@@ -136,212 +190,13 @@ async def test_user_flow_already_configured(
     assert result["reason"] == "already_configured"
 
 
-async def test_reauth_flow_success(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test successful reauth flow."""
-    result = await mock_config_entry.start_reauth_flow(hass)
-    assert result["type"] is FlowResultType.FORM
-    assert result["step_id"] == "reauth_confirm"
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "new_api_key"},
-        )
-
-    assert result["type"] is FlowResultType.ABORT
-    assert result["reason"] == "reauth_successful"
-    assert mock_config_entry.data[CONF_API_KEY] == "new_api_key"
-
-
-async def test_reauth_flow_invalid_auth(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test reauth flow with invalid auth."""
-    result = await mock_config_entry.start_reauth_flow(hass)
-
-    mock_perplexity_client.chat.completions.create.side_effect = AuthenticationError(
-        "Invalid API key", response=Mock(), body=None
-    )
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "invalid_key"},
-        )
-
-    assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "invalid_auth"}
-
-
-async def test_reauth_flow_cannot_connect(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test reauth flow with connection error."""
-    result = await mock_config_entry.start_reauth_flow(hass)
-
-    mock_perplexity_client.chat.completions.create.side_effect = PerplexityError(
-        "Connection error"
-    )
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "test_api_key"},
-        )
-
-    assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "cannot_connect"}
-
-
-async def test_reauth_flow_unknown_error(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test reauth flow with unknown error."""
-    result = await mock_config_entry.start_reauth_flow(hass)
-
-    mock_perplexity_client.chat.completions.create.side_effect = RuntimeError(
-        "Unknown error"
-    )
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "test_api_key"},
-        )
-
-    assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "unknown"}
-
-
-async def test_reconfigure_flow_success(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test successful reconfigure flow."""
-    result = await mock_config_entry.start_reconfigure_flow(hass)
-    assert result["type"] is FlowResultType.FORM
-    assert result["step_id"] == "reconfigure"
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "new_api_key"},
-        )
-
-    assert result["type"] is FlowResultType.ABORT
-    assert result["reason"] == "reconfigure_successful"
-    assert mock_config_entry.data[CONF_API_KEY] == "new_api_key"
-
-
-async def test_reconfigure_flow_invalid_auth(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test reconfigure flow with invalid auth."""
-    result = await mock_config_entry.start_reconfigure_flow(hass)
-
-    mock_perplexity_client.chat.completions.create.side_effect = AuthenticationError(
-        "Invalid API key", response=Mock(), body=None
-    )
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "invalid_key"},
-        )
-
-    assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "invalid_auth"}
-
-
-async def test_reconfigure_flow_cannot_connect(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test reconfigure flow with connection error."""
-    result = await mock_config_entry.start_reconfigure_flow(hass)
-
-    mock_perplexity_client.chat.completions.create.side_effect = PerplexityError(
-        "Connection error"
-    )
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "test_api_key"},
-        )
-
-    assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "cannot_connect"}
-
-
-async def test_reconfigure_flow_unknown_error(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test reconfigure flow with unknown error."""
-    result = await mock_config_entry.start_reconfigure_flow(hass)
-
-    mock_perplexity_client.chat.completions.create.side_effect = RuntimeError(
-        "Unknown error"
-    )
-
-    with patch(
-        "custom_components.perplexity.config_flow.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        result = await hass.config_entries.flow.async_configure(
-            result["flow_id"],
-            user_input={CONF_API_KEY: "test_api_key"},
-        )
-
-    assert result["type"] is FlowResultType.FORM
-    assert result["errors"] == {"base": "unknown"}
-
-
-async def test_get_supported_subentry_types(
-    mock_config_entry: MockConfigEntry,
-) -> None:
-    """Test async_get_supported_subentry_types returns ai_task_data."""
+@pytest.mark.parametrize("subentry_type", ["ai_task_data", "conversation"])
+def test_get_supported_subentry_types(subentry_type: str) -> None:
+    """Test async_get_supported_subentry_types returns all subentry types."""
     subentry_types = PerplexityConfigFlow.async_get_supported_subentry_types(
-        mock_config_entry
+        Mock(spec=ConfigEntry)
     )
-    assert "ai_task_data" in subentry_types
+    assert subentry_type in subentry_types
 
 
 async def test_ai_task_subentry_flow(
@@ -365,11 +220,27 @@ async def test_ai_task_subentry_flow(
     assert result["title"] == "Sonar Pro"
     assert result["data"] == {CONF_MODEL: "sonar-pro"}
 
+    subentry = mock_config_entry.subentries[
+        next(reversed(mock_config_entry.subentries))
+    ]
+    assert subentry.subentry_type == "ai_task_data"
+    assert subentry.title == "Sonar Pro"
+    assert subentry.data == {CONF_MODEL: "sonar-pro"}
 
-async def test_ai_task_subentry_options_flow_reasoning_model(
+
+@pytest.mark.parametrize(
+    ("model", "user_input"),
+    [
+        ("sonar-reasoning-pro", {CONF_WEB_SEARCH: True, CONF_REASONING_EFFORT: "high"}),
+        ("sonar", {CONF_WEB_SEARCH: True}),
+    ],
+)
+async def test_ai_task_subentry_reconfigure_flow(
     hass: HomeAssistant,
+    model: str,
+    user_input: dict[str, Any],
 ) -> None:
-    """Test AI task subentry options flow for reasoning model."""
+    """Test AI task subentry reconfigure flow."""
     entry = MockConfigEntry(
         domain=DOMAIN,
         title="Perplexity",
@@ -377,25 +248,14 @@ async def test_ai_task_subentry_options_flow_reasoning_model(
     )
     entry.add_to_hass(hass)
 
-    # Create a subentry with reasoning model
-    result = await hass.config_entries.subentries.async_init(
-        (entry.entry_id, "ai_task_data"),
-        context={"source": SOURCE_USER},
-    )
-
-    result = await hass.config_entries.subentries.async_configure(
-        result["flow_id"],
-        user_input={CONF_MODEL: "sonar-reasoning-pro"},
+    subentry_id = await _async_create_subentry(
+        hass, entry, "ai_task_data", {CONF_MODEL: model}
     )
 
-    assert result["type"] is FlowResultType.CREATE_ENTRY
-
-    subentry_id = next(iter(entry.subentries.keys()))
-
     subentry = entry.subentries[subentry_id]
-    assert subentry.data[CONF_MODEL] == "sonar-reasoning-pro"
+    assert subentry.data[CONF_MODEL] == model
 
-    # Now test reconfigure flow
+    # Reasoning effort is only shown for reasoning models
     result = await entry.start_subentry_reconfigure_flow(hass, subentry_id)
 
     assert result["type"] is FlowResultType.FORM
@@ -403,7 +263,7 @@ async def test_ai_task_subentry_options_flow_reasoning_model(
 
     result = await hass.config_entries.subentries.async_configure(
         result["flow_id"],
-        user_input={CONF_WEB_SEARCH: True, CONF_REASONING_EFFORT: "high"},
+        user_input=user_input,
     )
 
     assert result["type"] is FlowResultType.ABORT
@@ -411,71 +271,16 @@ async def test_ai_task_subentry_options_flow_reasoning_model(
 
     # Verify the options were saved
     subentry = entry.subentries[subentry_id]
-    assert subentry.data[CONF_REASONING_EFFORT] == "high"
-    assert subentry.data[CONF_WEB_SEARCH] is True
-
-
-async def test_ai_task_subentry_options_flow_non_reasoning_model(
-    hass: HomeAssistant,
-) -> None:
-    """Test AI task subentry options flow for non-reasoning model."""
-    entry = MockConfigEntry(
-        domain=DOMAIN,
-        title="Perplexity",
-        data={"api_key": "test_api_key"},
-    )
-    entry.add_to_hass(hass)
-
-    result = await hass.config_entries.subentries.async_init(
-        (entry.entry_id, "ai_task_data"),
-        context={"source": SOURCE_USER},
-    )
-
-    result = await hass.config_entries.subentries.async_configure(
-        result["flow_id"],
-        user_input={CONF_MODEL: "sonar"},
-    )
-
-    assert result["type"] is FlowResultType.CREATE_ENTRY
-
-    subentry_id = next(iter(entry.subentries.keys()))
-
-    # Now test reconfigure flow - should show web_search only
-    result = await entry.start_subentry_reconfigure_flow(hass, subentry_id)
-
-    assert result["type"] is FlowResultType.FORM
-    assert result["step_id"] == "reconfigure"
-
-    result = await hass.config_entries.subentries.async_configure(
-        result["flow_id"],
-        user_input={CONF_WEB_SEARCH: True},
-    )
-
-    assert result["type"] is FlowResultType.ABORT
-    assert result["reason"] == "reconfigure_successful"
-
-    # Verify the option was saved
-    subentry = entry.subentries[subentry_id]
-    assert subentry.data[CONF_WEB_SEARCH] is True
-
-
-async def test_get_supported_subentry_types_includes_conversation(
-    mock_config_entry: MockConfigEntry,
-) -> None:
-    """Test async_get_supported_subentry_types returns conversation."""
-    subentry_types = PerplexityConfigFlow.async_get_supported_subentry_types(
-        mock_config_entry
-    )
-    assert "conversation" in subentry_types
+    assert user_input.items() <= subentry.data.items()
 
 
 async def test_conversation_subentry_flow(
     hass: HomeAssistant,
-    mock_setup_entry: MockConfigEntry,
+    mock_loaded_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry flow."""
     result = await hass.config_entries.subentries.async_init(
-        (mock_setup_entry.entry_id, "conversation"),
+        (mock_loaded_entry.entry_id, "conversation"),
         context={"source": SOURCE_USER},
     )
     assert result["type"] is FlowResultType.FORM
@@ -494,14 +299,22 @@ async def test_conversation_subentry_flow(
     assert result["data"][CONF_MODEL] == "sonar-pro"
     assert result["data"][CONF_LLM_HASS_API] == [llm.LLM_API_ASSIST]
 
+    subentry = mock_loaded_entry.subentries[
+        next(reversed(mock_loaded_entry.subentries))
+    ]
+    assert subentry.subentry_type == "conversation"
+    assert subentry.title == "Sonar Pro"
+    assert subentry.data[CONF_MODEL] == "sonar-pro"
+    assert subentry.data[CONF_LLM_HASS_API] == [llm.LLM_API_ASSIST]
+
 
 async def test_conversation_subentry_flow_without_assist(
     hass: HomeAssistant,
-    mock_setup_entry: MockConfigEntry,
+    mock_loaded_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry flow without LLM assist."""
     result = await hass.config_entries.subentries.async_init(
-        (mock_setup_entry.entry_id, "conversation"),
+        (mock_loaded_entry.entry_id, "conversation"),
         context={"source": SOURCE_USER},
     )
     assert result["type"] is FlowResultType.FORM
@@ -523,11 +336,11 @@ async def test_conversation_subentry_flow_without_assist(
 
 async def test_conversation_subentry_flow_with_prompt(
     hass: HomeAssistant,
-    mock_setup_entry: MockConfigEntry,
+    mock_loaded_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry flow with custom prompt."""
     result = await hass.config_entries.subentries.async_init(
-        (mock_setup_entry.entry_id, "conversation"),
+        (mock_loaded_entry.entry_id, "conversation"),
         context={"source": SOURCE_USER},
     )
 
@@ -547,34 +360,18 @@ async def test_conversation_subentry_flow_with_prompt(
 
 async def test_conversation_subentry_reconfigure_flow(
     hass: HomeAssistant,
-    mock_setup_entry: MockConfigEntry,
+    mock_loaded_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry reconfigure flow."""
-    # First create a conversation subentry
-    result = await hass.config_entries.subentries.async_init(
-        (mock_setup_entry.entry_id, "conversation"),
-        context={"source": SOURCE_USER},
+    conversation_subentry_id = await _async_create_subentry(
+        hass,
+        mock_loaded_entry,
+        "conversation",
+        {CONF_MODEL: "sonar", CONF_LLM_HASS_API: [llm.LLM_API_ASSIST]},
     )
-    result = await hass.config_entries.subentries.async_configure(
-        result["flow_id"],
-        user_input={
-            CONF_MODEL: "sonar",
-            CONF_LLM_HASS_API: [llm.LLM_API_ASSIST],
-        },
-    )
-    assert result["type"] is FlowResultType.CREATE_ENTRY
-
-    # Find the conversation subentry
-    conversation_subentry_id = None
-    for subentry_id, subentry in mock_setup_entry.subentries.items():
-        if subentry.subentry_type == "conversation":
-            conversation_subentry_id = subentry_id
-            break
-
-    assert conversation_subentry_id is not None
 
     # Reconfigure
-    result = await mock_setup_entry.start_subentry_reconfigure_flow(
+    result = await mock_loaded_entry.start_subentry_reconfigure_flow(
         hass, conversation_subentry_id
     )
 
@@ -594,7 +391,7 @@ async def test_conversation_subentry_reconfigure_flow(
     assert result["reason"] == "reconfigure_successful"
 
     # Verify the update
-    subentry = mock_setup_entry.subentries[conversation_subentry_id]
+    subentry = mock_loaded_entry.subentries[conversation_subentry_id]
     assert subentry.data[CONF_MODEL] == "sonar-pro"
 
 
@@ -603,22 +400,23 @@ async def test_conversation_subentry_flow_entry_not_loaded(
     mock_config_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry flow when entry is not loaded."""
-    # Don't set up the entry (leave it not loaded)
-    result = await hass.config_entries.subentries.async_init(
-        (mock_config_entry.entry_id, "conversation"),
-        context={"source": SOURCE_USER},
-    )
+    flow = PerplexityConversationFlowHandler()
+    flow.hass = hass
+    flow.handler = (mock_config_entry.entry_id, "conversation")
+
+    result = await flow.async_step_user()
+
     assert result["type"] is FlowResultType.ABORT
     assert result["reason"] == "entry_not_loaded"
 
 
 async def test_conversation_subentry_flow_with_web_search(
     hass: HomeAssistant,
-    mock_setup_entry: MockConfigEntry,
+    mock_loaded_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry flow with web search enabled."""
     result = await hass.config_entries.subentries.async_init(
-        (mock_setup_entry.entry_id, "conversation"),
+        (mock_loaded_entry.entry_id, "conversation"),
         context={"source": SOURCE_USER},
     )
     assert result["type"] is FlowResultType.FORM
@@ -638,11 +436,11 @@ async def test_conversation_subentry_flow_with_web_search(
 
 async def test_conversation_subentry_flow_reasoning_model(
     hass: HomeAssistant,
-    mock_setup_entry: MockConfigEntry,
+    mock_loaded_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry flow with reasoning model and effort."""
     result = await hass.config_entries.subentries.async_init(
-        (mock_setup_entry.entry_id, "conversation"),
+        (mock_loaded_entry.entry_id, "conversation"),
         context={"source": SOURCE_USER},
     )
     assert result["type"] is FlowResultType.FORM
@@ -665,38 +463,22 @@ async def test_conversation_subentry_flow_reasoning_model(
 
 async def test_conversation_subentry_reconfigure_web_search_and_reasoning(
     hass: HomeAssistant,
-    mock_setup_entry: MockConfigEntry,
+    mock_loaded_entry: MockConfigEntry,
 ) -> None:
     """Test conversation subentry reconfigure with web search and reasoning."""
-    # Create a conversation subentry with reasoning model
-    result = await hass.config_entries.subentries.async_init(
-        (mock_setup_entry.entry_id, "conversation"),
-        context={"source": SOURCE_USER},
-    )
-    result = await hass.config_entries.subentries.async_configure(
-        result["flow_id"],
-        user_input={
+    conversation_subentry_id = await _async_create_subentry(
+        hass,
+        mock_loaded_entry,
+        "conversation",
+        {
             CONF_MODEL: "sonar-reasoning-pro",
             CONF_LLM_HASS_API: [llm.LLM_API_ASSIST],
             CONF_WEB_SEARCH: False,
         },
     )
-    assert result["type"] is FlowResultType.CREATE_ENTRY
-
-    # Find the new conversation subentry
-    conversation_subentry_id = None
-    for subentry_id, subentry in mock_setup_entry.subentries.items():
-        if (
-            subentry.subentry_type == "conversation"
-            and subentry.data.get(CONF_MODEL) == "sonar-reasoning-pro"
-        ):
-            conversation_subentry_id = subentry_id
-            break
-
-    assert conversation_subentry_id is not None
 
     # Reconfigure — now reasoning_effort should appear since model is known
-    result = await mock_setup_entry.start_subentry_reconfigure_flow(
+    result = await mock_loaded_entry.start_subentry_reconfigure_flow(
         hass, conversation_subentry_id
     )
     assert result["type"] is FlowResultType.FORM
@@ -715,6 +497,6 @@ async def test_conversation_subentry_reconfigure_web_search_and_reasoning(
     assert result["type"] is FlowResultType.ABORT
     assert result["reason"] == "reconfigure_successful"
 
-    subentry = mock_setup_entry.subentries[conversation_subentry_id]
+    subentry = mock_loaded_entry.subentries[conversation_subentry_id]
     assert subentry.data[CONF_WEB_SEARCH] is True
     assert subentry.data[CONF_REASONING_EFFORT] == "high"
@@ -1,15 +1,18 @@
 """Tests for the Perplexity Conversation entity."""
 
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, Callable
+from datetime import timedelta
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
+import pytest
 from homeassistant.components import conversation
 from homeassistant.const import CONF_MODEL, Platform
-from homeassistant.core import Context, HomeAssistant
+from homeassistant.core import Context, HomeAssistant, ServiceCall
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers import intent
 from homeassistant.helpers.json import json_dumps
+from homeassistant.util import dt as dt_util
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
     async_fire_time_changed,
@@ -26,10 +29,117 @@ from custom_components.perplexity.conversation import (
     ParsedAction,
     _parse_json_response,
 )
+from tests import (
+    ENTITY_ENTRY_EXCLUDED_KEYS,
+    STATE_EXCLUDED_KEYS,
+    setup_integration,
+)
 
 CONVERSATION_ENTITY_ID = "conversation.sonar"
+EXPECTED_PROMPT_FRAGMENTS = (
+    "script: {}",
+    "calendar: {}",
+    "  light.living_room:\n    names: living room\n    domain: light\n    state: 'off'",
+)
+TURN_ON_RESPONSE = json_dumps(
+    {
+        "response": "I've turned on the living room light for you.",
+        "actions": [
+            {
+                "domain": "light",
+                "service": "turn_on",
+                "target": "light.living_room",
+                "data": None,
+            }
+        ],
+    }
+)
+NULL_ACTIONS_RESPONSE = json_dumps(
+    {"response": "The weather is sunny today.", "actions": None}
+)
+BRIGHTNESS_RESPONSE = json_dumps(
+    {
+        "response": "I've set the brightness to 128.",
+        "actions": [
+            {
+                "domain": "light",
+                "service": "turn_on",
+                "target": "light.living_room",
+                "data": {"brightness": 128},
+            }
+        ],
+    }
+)
+MULTIPLE_ACTIONS_RESPONSE = json_dumps(
+    {
+        "response": "I've turned on both lights.",
+        "actions": [
+            {
+                "domain": "light",
+                "service": "turn_on",
+                "target": "light.living_room",
+                "data": None,
+            },
+            {
+                "domain": "light",
+                "service": "turn_on",
+                "target": "light.bedroom",
+                "data": None,
+            },
+        ],
+    }
+)
+DELAYED_ACTION_RESPONSE = json_dumps(
+    {
+        "response": "I'll turn off the living room light for 5 minutes.",
+        "actions": [
+            {
+                "domain": "light",
+                "service": "turn_off",
+                "target": "light.living_room",
+                "data": None,
+                "delay_seconds": 300,
+            }
+        ],
+    }
+)
+NON_DICT_ACTION_RESPONSE = json_dumps(
+    {
+        "response": "Test",
+        "actions": [
+            "not a dict",
+            {
+                "domain": "light",
+                "service": "turn_on",
+                "target": "light.test",
+                "data": None,
+            },
+        ],
+    }
+)
+EXTRA_PROMPT_RESPONSE = json_dumps(
+    {
+        "response": "Done with extra prompt.",
+        "actions": None,
+    }
+)
+
 
+def capture_create_kwargs(
+    client: MagicMock, stream: AsyncGenerator[Any]
+) -> dict[str, Any]:
+    """Return the stream from the client and capture the request arguments."""
+    captured: dict[str, Any] = {}
 
+    async def _create(**kwargs: object) -> AsyncGenerator[Any]:
+        captured.update(kwargs)
+        return stream
+
+    client.chat.completions.create.side_effect = _create
+    return captured
+
+
+@pytest.mark.snapshot
 async def test_conversation_entity(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
@@ -37,15 +147,8 @@ async def test_conversation_entity(
     snapshot: SnapshotAssertion,
 ) -> None:
     """Test Conversation entity."""
-    with (
-        patch(
-            "custom_components.perplexity.AsyncPerplexity",
-            return_value=mock_perplexity_client,
-        ),
-        patch("custom_components.perplexity.PLATFORMS", [Platform.CONVERSATION]),
-    ):
+    with patch("custom_components.perplexity.PLATFORMS", [Platform.CONVERSATION]):
         assert await hass.config_entries.async_setup(mock_config_entry.entry_id)
-        await hass.async_block_till_done()
 
     entity_registry = er.async_get(hass)
 
@@ -56,78 +159,36 @@ async def test_conversation_entity(
     assert len(entity_entries) == 1
 
     for entity_entry in entity_entries:
-        entity_entry_dict = entity_entry.as_partial_dict
-        for item in (
-            "area_id",
-            "categories",
-            "config_entry_id",
-            "created_at",
-            "device_id",
-            "hidden_by",
-            "id",
-            "labels",
-            "modified_at",
-        ):
-            entity_entry_dict.pop(item)
+        entity_entry_dict = {
+            key: value
+            for key, value in entity_entry.as_partial_dict.items()
+            if key not in ENTITY_ENTRY_EXCLUDED_KEYS
+        }
         assert entity_entry_dict == snapshot(name=f"{entity_entry.entity_id}-entry")
 
         state = hass.states.get(entity_entry.entity_id)
         assert state is not None
 
-        state_dict = state._as_dict
-        for item in ("context", "last_changed", "last_reported", "last_updated"):
-            state_dict.pop(item)
+        state_dict = {
+            key: value
+            for key, value in state._as_dict.items()
+            if key not in STATE_EXCLUDED_KEYS
+        }
         assert state_dict == snapshot(name=f"{entity_entry.entity_id}-state")
 
 
-async def test_conversation_without_actions(
-    hass: HomeAssistant,
-    mock_perplexity_client: MagicMock,
-    mock_setup_entry: MockConfigEntry,
-    mock_stream: MagicMock,
-) -> None:
-    """Test basic conversation without actions."""
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("Hello! How can I help you today?")
-    )
-
-    result = await conversation.async_converse(
-        hass,
-        "Hello",
-        None,
-        Context(),
-        agent_id=CONVERSATION_ENTITY_ID,
-    )
-
-    assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
-
-
 async def test_conversation_with_actions(
     hass: HomeAssistant,
     mock_perplexity_client: MagicMock,
     mock_setup_entry: MockConfigEntry,
     mock_stream: MagicMock,
-    service_calls: list,
+    light_service_calls: list[ServiceCall],
 ) -> None:
     """Test conversation with action execution."""
     hass.states.async_set("light.living_room", "off")
 
-    # Mock the streaming response with JSON containing an action
-    json_response = json_dumps(
-        {
-            "response": "I've turned on the living room light for you.",
-            "actions": [
-                {
-                    "domain": "light",
-                    "service": "turn_on",
-                    "target": "light.living_room",
-                    "data": None,
-                }
-            ],
-        }
-    )
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream(json_response)
+    call_args = capture_create_kwargs(
+        mock_perplexity_client, mock_stream(TURN_ON_RESPONSE)
     )
 
     result = await conversation.async_converse(
@@ -139,31 +200,27 @@ async def test_conversation_with_actions(
     )
 
     # Verify the service was called
-    assert len(service_calls) == 1
-    assert service_calls[0].domain == "light"
-    assert service_calls[0].service == "turn_on"
-    assert service_calls[0].data.get("entity_id") == "light.living_room"
+    assert len(light_service_calls) == 1
+    assert light_service_calls[0].domain == "light"
+    assert light_service_calls[0].service == "turn_on"
+    assert light_service_calls[0].data.get("entity_id") == "light.living_room"
 
     assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
     # Verify the response text was extracted from JSON
     assert "turned on" in result.response.speech["plain"]["speech"].lower()
 
     # Verify chat arguments
-    call_args = mock_perplexity_client.chat.completions.create.call_args[1]
     assert call_args["model"] == "sonar"
     assert call_args["disable_search"] is True
     assert call_args["stream"] is True
 
     messages = call_args["messages"]
-    assert "script: {}" in messages[0]["content"]
-    assert "calendar: {}" in messages[0]["content"]
-    assert (
-        "entities:\n"
-        "  light.living_room:\n"
-        "    names: living room\n"
-        "    domain: light\n"
-        "    state: 'off'"
-    ) in messages[0]["content"]
+    # Fragments must appear in the system prompt in this order
+    position = 0
+    for fragment in EXPECTED_PROMPT_FRAGMENTS:
+        position = messages[0]["content"].find(fragment, position)
+        assert position >= 0, fragment
+        position += len(fragment)
     assert messages[1] == {"role": "user", "content": "Turn on the living room light"}
     assert messages[2] == {
         "role": "assistant",
@@ -171,48 +228,103 @@ async def test_conversation_with_actions(
     }
 
 
-async def test_conversation_with_actions_and_data(
+@pytest.mark.parametrize(
+    ("text", "response", "expected_calls", "speech", "delay"),
+    [
+        pytest.param(
+            "Hello",
+            "Hello! How can I help you today?",
+            [],
+            "how can i help",
+            0,
+            id="no_actions",
+        ),
+        pytest.param(
+            "What's the weather?",
+            NULL_ACTIONS_RESPONSE,
+            [],
+            "sunny",
+            0,
+            id="null_actions",
+        ),
+        pytest.param(
+            "Set the living room light to 50%",
+            BRIGHTNESS_RESPONSE,
+            [
+                (
+                    "light",
+                    "turn_on",
+                    {"entity_id": "light.living_room", "brightness": 128},
+                )
+            ],
+            "brightness",
+            0,
+            id="action_with_data",
+        ),
+        pytest.param(
+            "Turn on all lights",
+            MULTIPLE_ACTIONS_RESPONSE,
+            [
+                ("light", "turn_on", {"entity_id": "light.living_room"}),
+                ("light", "turn_on", {"entity_id": "light.bedroom"}),
+            ],
+            "both lights",
+            0,
+            id="multiple_actions",
+        ),
+        pytest.param(
+            "Turn off the living room light for 5 minutes",
+            DELAYED_ACTION_RESPONSE,
+            [("light", "turn_off", {"entity_id": "light.living_room"})],
+            "5 minutes",
+            300,
+            id="delayed_action",
+        ),
+    ],
+)
+async def test_conversation_action_variants(
     hass: HomeAssistant,
     mock_perplexity_client: MagicMock,
     mock_setup_entry: MockConfigEntry,
     mock_stream: MagicMock,
-    service_calls: list,
+    light_service_calls: list[ServiceCall],
+    mock_lights: None,
+    text: str,
+    response: str,
+    expected_calls: list[tuple[str, str, dict[str, Any]]],
+    speech: str,
+    delay: int,
 ) -> None:
-    """Test conversation with action that includes extra service data."""
-    hass.states.async_set("light.living_room", "off")
+    """Test conversation responses with and without actions."""
+    if delay:
+        # The delayed action turns off a light that is currently on
+        hass.states.async_set("light.living_room", "on")
 
-    json_response = json_dumps(
-        {
-            "response": "I've set the brightness to 128.",
-            "actions": [
-                {
-                    "domain": "light",
-                    "service": "turn_on",
-                    "target": "light.living_room",
-                    "data": {"brightness": 128},
-                }
-            ],
-        }
-    )
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream(json_response)
-    )
+    mock_perplexity_client.chat.completions.create.return_value = mock_stream(response)
 
     result = await conversation.async_converse(
         hass,
-        "Set the living room light to 50%",
+        text,
         None,
         Context(),
         agent_id=CONVERSATION_ENTITY_ID,
     )
 
-    assert len(service_calls) == 1
-    assert service_calls[0].domain == "light"
-    assert service_calls[0].service == "turn_on"
-    assert service_calls[0].data.get("entity_id") == "light.living_room"
-    assert service_calls[0].data.get("brightness") == 128
-
     assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
+    assert speech in result.response.speech["plain"]["speech"].lower()
+
+    if delay:
+        # Nothing runs until the delay has passed
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=delay // 2))
+        await hass.async_block_till_done()
+        assert light_service_calls == []
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=delay))
+        await hass.async_block_till_done()
+
+    assert [
+        (call.domain, call.service, call.data) for call in light_service_calls
+    ] == expected_calls
 
 
 async def test_conversation_web_search_enabled(
@@ -241,15 +353,10 @@ async def test_conversation_web_search_enabled(
     )
     entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+    await setup_integration(hass, entry)
 
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("Web search result")
+    call_kwargs = capture_create_kwargs(
+        mock_perplexity_client, mock_stream("Web search result")
     )
 
     result = await conversation.async_converse(
@@ -262,89 +369,9 @@ async def test_conversation_web_search_enabled(
 
     assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
 
-    call_kwargs = mock_perplexity_client.chat.completions.create.call_args.kwargs
     assert call_kwargs["disable_search"] is False
 
 
-async def test_conversation_with_multiple_actions(
-    hass: HomeAssistant,
-    mock_perplexity_client: MagicMock,
-    mock_setup_entry: MockConfigEntry,
-    mock_stream: MagicMock,
-    service_calls: list,
-) -> None:
-    """Test conversation with multiple actions in one response."""
-    hass.states.async_set("light.living_room", "off")
-    hass.states.async_set("light.bedroom", "off")
-
-    json_response = json_dumps(
-        {
-            "response": "I've turned on both lights.",
-            "actions": [
-                {
-                    "domain": "light",
-                    "service": "turn_on",
-                    "target": "light.living_room",
-                    "data": None,
-                },
-                {
-                    "domain": "light",
-                    "service": "turn_on",
-                    "target": "light.bedroom",
-                    "data": None,
-                },
-            ],
-        }
-    )
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream(json_response)
-    )
-
-    result = await conversation.async_converse(
-        hass,
-        "Turn on all lights",
-        None,
-        Context(),
-        agent_id=CONVERSATION_ENTITY_ID,
-    )
-
-    assert len(service_calls) == 2
-    assert service_calls[0].data.get("entity_id") == "light.living_room"
-    assert service_calls[1].data.get("entity_id") == "light.bedroom"
-    assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
-
-
-async def test_conversation_with_null_actions(
-    hass: HomeAssistant,
-    mock_perplexity_client: MagicMock,
-    mock_setup_entry: MockConfigEntry,
-    mock_stream: MagicMock,
-    service_calls: list,
-) -> None:
-    """Test conversation response with null actions (no action needed)."""
-    json_response = json_dumps(
-        {
-            "response": "The weather is sunny today.",
-            "actions": None,
-        }
-    )
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream(json_response)
-    )
-
-    result = await conversation.async_converse(
-        hass,
-        "What's the weather?",
-        None,
-        Context(),
-        agent_id=CONVERSATION_ENTITY_ID,
-    )
-
-    assert len(service_calls) == 0
-    assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
-    assert "sunny" in result.response.speech["plain"]["speech"].lower()
-
-
 def test_parse_json_response_invalid_json_in_markdown() -> None:
     """Test parsing invalid JSON in markdown code block."""
     response = "```json\n{invalid json here}\n```"
@@ -365,22 +392,7 @@ def test_parse_json_response_content_key_fallback() -> None:
 
 def test_parse_json_response_non_dict_action_skipped() -> None:
     """Test that non-dict items in actions list are skipped."""
-    response = json_dumps(
-        {
-            "response": "Test",
-            "actions": [
-                "not a dict",
-                {
-                    "domain": "light",
-                    "service": "turn_on",
-                    "target": "light.test",
-                    "data": None,
-                },
-            ],
-        }
-    )
-
-    result = _parse_json_response(response)
+    result = _parse_json_response(NON_DICT_ACTION_RESPONSE)
 
     assert result.content == "Test"
     assert len(result.actions) == 1
@@ -401,14 +413,8 @@ async def test_conversation_extra_system_prompt(
     mock_stream: MagicMock,
 ) -> None:
     """Test conversation with extra system prompt in action mode."""
-    json_response = json_dumps(
-        {
-            "response": "Done with extra prompt.",
-            "actions": None,
-        }
-    )
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream(json_response)
+    mock_perplexity_client.chat.completions.create.return_value = mock_stream(
+        EXTRA_PROMPT_RESPONSE
     )
 
     result = await conversation.async_converse(
@@ -423,58 +429,6 @@ async def test_conversation_extra_system_prompt(
     assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
 
 
-async def test_conversation_with_delayed_action(
-    hass: HomeAssistant,
-    mock_perplexity_client: MagicMock,
-    mock_setup_entry: MockConfigEntry,
-    mock_stream: MagicMock,
-    service_calls: list,
-) -> None:
-    """Test conversation with action that includes delayed execution."""
-    hass.states.async_set("light.living_room", "on")
-
-    json_response = json_dumps(
-        {
-            "response": "I'll turn off the living room light for 5 minutes.",
-            "actions": [
-                {
-                    "domain": "light",
-                    "service": "turn_off",
-                    "target": "light.living_room",
-                    "data": None,
-                    "delay_seconds": 300,
-                }
-            ],
-        }
-    )
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream(json_response)
-    )
-
-    result = await conversation.async_converse(
-        hass,
-        "Turn off the living room light for 5 minutes",
-        None,
-        Context(),
-        agent_id=CONVERSATION_ENTITY_ID,
-    )
-
-    assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
-
-    # No immediate actions
-    assert len(service_calls) == 0
-
-    # Fire the timer
-    async_fire_time_changed(hass, fire_all=True)
-    await hass.async_block_till_done()
-
-    # Delayed action executed
-    assert len(service_calls) == 1
-    assert service_calls[0].domain == "light"
-    assert service_calls[0].service == "turn_off"
-    assert service_calls[0].data.get("entity_id") == "light.living_room"
-
-
 async def test_conversation_with_home_location(
     hass: HomeAssistant,
     mock_perplexity_client: MagicMock,
@@ -506,15 +460,10 @@ async def test_conversation_with_home_location(
     )
     entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+    await setup_integration(hass, entry)
 
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("The weather in London is nice today.")
+    call_args = capture_create_kwargs(
+        mock_perplexity_client, mock_stream("The weather in London is nice today.")
     )
 
     result = await conversation.async_converse(
@@ -527,7 +476,6 @@ async def test_conversation_with_home_location(
 
     assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
 
-    call_args = mock_perplexity_client.chat.completions.create.call_args[1]
     system_content = call_args["messages"][0]["content"]
 
     assert "Coordinates: 51.507,-0.128" in system_content
@@ -565,15 +513,10 @@ async def test_conversation_with_home_location_no_country(
     )
     entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+    await setup_integration(hass, entry)
 
-    mock_perplexity_client.chat.completions.create = AsyncMock(
-        return_value=mock_stream("The weather in London is nice today.")
+    call_args = capture_create_kwargs(
+        mock_perplexity_client, mock_stream("The weather in London is nice today.")
     )
 
     result = await conversation.async_converse(
@@ -586,7 +529,6 @@ async def test_conversation_with_home_location_no_country(
 
     assert result.response.response_type == intent.IntentResponseType.ACTION_DONE
 
-    call_args = mock_perplexity_client.chat.completions.create.call_args[1]
     system_content = call_args["messages"][0]["content"]
 
     assert "Coordinates: 51.507,-0.128" in system_content
@@ -1,5 +1,6 @@
 """Tests for the diagnostics data provided by the Perplexity integration."""
 
+import pytest
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 from pytest_homeassistant_custom_component.components.diagnostics import (
@@ -9,6 +10,7 @@ from pytest_homeassistant_custom_component.typing import ClientSessionGenerator
 from syrupy.assertion import SnapshotAssertion
 
 
+@pytest.mark.snapshot
 async def test_diagnostics(
     hass: HomeAssistant,
     hass_client: ClientSessionGenerator,
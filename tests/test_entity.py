@@ -1,6 +1,7 @@
 """Tests for the Perplexity entity module."""
 
 from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock
 
 import pytest
@@ -22,91 +23,105 @@ from custom_components.perplexity.entity import (
 )
 
 
-def test_adjust_schema_object_with_properties() -> None:
-    """Test _adjust_schema with object type and properties."""
-    schema = {
-        "type": "object",
-        "properties": {
-            "name": {"type": "string"},
-            "age": {"type": "integer"},
-        },
-    }
-    _adjust_schema(schema)
-
-    assert schema["required"] == ["name", "age"]
-    assert schema["properties"]["name"]["type"] == ["string", "null"]
-    assert schema["properties"]["age"]["type"] == ["integer", "null"]
-
-
-def test_adjust_schema_object_without_properties() -> None:
-    """Test _adjust_schema with object type but no properties."""
-    schema = {"type": "object"}
-    _adjust_schema(schema)
-
-    assert "required" not in schema
-
-
-def test_adjust_schema_object_with_existing_required() -> None:
-    """Test _adjust_schema with object that already has required fields."""
-    schema = {
-        "type": "object",
-        "properties": {
-            "name": {"type": "string"},
-            "age": {"type": "integer"},
-        },
-        "required": ["name"],
-    }
-    _adjust_schema(schema)
-
-    assert "name" in schema["required"]
-    assert "age" in schema["required"]
-    # name was already required, so type should not be modified to include null
-    assert schema["properties"]["name"]["type"] == "string"
-    # age was not required, so type should be modified
-    assert schema["properties"]["age"]["type"] == ["integer", "null"]
-
-
-def test_adjust_schema_array_with_items() -> None:
-    """Test _adjust_schema with array type and items."""
-    schema = {
-        "type": "array",
-        "items": {
-            "type": "object",
-            "properties": {
-                "id": {"type": "integer"},
+@pytest.mark.parametrize(
+    ("schema", "expected"),
+    [
+        pytest.param(
+            {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "age": {"type": "integer"},
+                },
             },
-        },
-    }
-    _adjust_schema(schema)
-
-    assert schema["items"]["required"] == ["id"]
-
-
-def test_adjust_schema_array_without_items() -> None:
-    """Test _adjust_schema with array type but no items."""
-    schema = {"type": "array"}
-    _adjust_schema(schema)
-
-    assert "items" not in schema
-
-
-def test_adjust_schema_nested_objects() -> None:
-    """Test _adjust_schema with nested object structures."""
-    schema = {
-        "type": "object",
-        "properties": {
-            "nested": {
+            {
                 "type": "object",
                 "properties": {
-                    "value": {"type": "string"},
+                    "name": {"type": ["string", "null"]},
+                    "age": {"type": ["integer", "null"]},
                 },
+                "required": ["name", "age"],
             },
-        },
-    }
+            id="object_with_properties",
+        ),
+        pytest.param(
+            {"type": "object"},
+            {"type": "object"},
+            id="object_without_properties",
+        ),
+        pytest.param(
+            {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "age": {"type": "integer"},
+                },
+                "required": ["name"],
+            },
+            {
+                "type": "object",
+                "properties": {
+                    # Already required, so the type is left as is
+                    "name": {"type": "string"},
+                    "age": {"type": ["integer", "null"]},
+                },
+                "required": ["name", "age"],
+            },
+            id="object_with_existing_required",
+        ),
+        pytest.param(
+            {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"id": {"type": "integer"}},
+                },
+            },
+            {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {"id": {"type": ["integer", "null"]}},
+                    "required": ["id"],
+                },
+            },
+            id="array_with_items",
+        ),
+        pytest.param(
+            {"type": "array"},
+            {"type": "array"},
+            id="array_without_items",
+        ),
+        pytest.param(
+            {
+                "type": "object",
+                "properties": {
+                    "nested": {
+                        "type": "object",
+                        "properties": {"value": {"type": "string"}},
+                    },
+                },
+            },
+            {
+                "type": "object",
+                "properties": {
+                    "nested": {
+                        "type": ["object", "null"],
+                        "properties": {"value": {"type": ["string", "null"]}},
+                        "required": ["value"],
+                    },
+                },
+                "required": ["nested"],
+            },
+            id="nested_objects",
+        ),
+    ],
+)
+def test_adjust_schema(schema: dict[str, Any], expected: dict[str, Any]) -> None:
+    """Test _adjust_schema."""
     _adjust_schema(schema)
 
-    assert schema["required"] == ["nested"]
-    assert schema["properties"]["nested"]["required"] == ["value"]
+    assert schema == expected
 
 
 def test_format_structured_output_without_llm_api() -> None:
@@ -123,8 +138,7 @@ def test_format_structured_output_without_llm_api() -> None:
 def test_format_structured_output_with_llm_api() -> None:
     """Test _format_structured_output with LLM API."""
     schema = vol.Schema({vol.Required("key"): str})
-    mock_llm_api = MagicMock()
-    mock_llm_api.custom_serializer = llm.selector_serializer
+    mock_llm_api = MagicMock(custom_serializer=llm.selector_serializer)
 
     result = _format_structured_output("test_name", schema, mock_llm_api)
 
@@ -132,52 +146,38 @@ def test_format_structured_output_with_llm_api() -> None:
     assert result["json_schema"]["name"] == "test_name"
 
 
-def test_convert_content_system() -> None:
-    """Test _convert_content_to_chat_message with system content."""
-    content = conversation.SystemContent(
-        content="You are a helpful assistant.",
-    )
-
-    result = _convert_content_to_chat_message(content)
-
-    assert result["role"] == "system"
-    assert result["content"] == "You are a helpful assistant."
-
-
-def test_convert_content_user() -> None:
-    """Test _convert_content_to_chat_message with user content."""
-    content = conversation.UserContent(
-        content="Hello!",
-    )
-
-    result = _convert_content_to_chat_message(content)
-
-    assert result["role"] == "user"
-    assert result["content"] == "Hello!"
-
-
-def test_convert_content_assistant() -> None:
-    """Test _convert_content_to_chat_message with assistant content."""
-    content = conversation.AssistantContent(
-        agent_id="test_agent",
-        content="Hello! How can I help?",
-    )
-
-    result = _convert_content_to_chat_message(content)
-
-    assert result["role"] == "assistant"
-    assert result["content"] == "Hello! How can I help?"
-
-
-def test_convert_content_unknown_role() -> None:
-    """Test _convert_content_to_chat_message with unknown role."""
-    content = MagicMock()
-    content.role = "unknown"
-    content.content = "test"
-
-    result = _convert_content_to_chat_message(content)
-
-    assert result is None
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        pytest.param(
+            conversation.SystemContent(content="You are a helpful assistant."),
+            {"role": "system", "content": "You are a helpful assistant."},
+            id="system",
+        ),
+        pytest.param(
+            conversation.UserContent(content="Hello!"),
+            {"role": "user", "content": "Hello!"},
+            id="user",
+        ),
+        pytest.param(
+            conversation.AssistantContent(
+                agent_id="test_agent", content="Hello! How can I help?"
+            ),
+            {"role": "assistant", "content": "Hello! How can I help?"},
+            id="assistant",
+        ),
+        pytest.param(
+            MagicMock(role="unknown", content="test"),
+            None,
+            id="unknown_role",
+        ),
+    ],
+)
+def test_convert_content_to_chat_message(
+    content: conversation.Content, expected: dict[str, Any] | None
+) -> None:
+    """Test _convert_content_to_chat_message."""
+    assert _convert_content_to_chat_message(content) == expected
 
 
 async def test_async_prepare_files_for_prompt_file_not_exists(
@@ -204,20 +204,10 @@ async def test_async_prepare_files_for_prompt_non_image(
 
 async def test_async_prepare_files_for_prompt_success(
     hass: HomeAssistant,
-    tmp_path: Path,
+    tiny_png: Path,
 ) -> None:
     """Test _async_prepare_files_for_prompt with valid image file."""
-    # Create a minimal PNG file (1x1 pixel)
-    test_file = tmp_path / "test.png"
-    # Minimal PNG header
-    png_data = (
-        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
-        b"\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx"
-        b"\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82"
-    )
-    test_file.write_bytes(png_data)
-
-    result = await _async_prepare_files_for_prompt([(test_file, "image/png")])
+    result = await _async_prepare_files_for_prompt([(tiny_png, "image/png")])
 
     assert len(result) == 1
     assert result[0]["type"] == "image_url"
@@ -226,20 +216,11 @@ async def test_async_prepare_files_for_prompt_success(
 
 async def test_async_prepare_files_for_prompt_auto_mime_type(
     hass: HomeAssistant,
-    tmp_path: Path,
+    tiny_png: Path,
 ) -> None:
     """Test _async_prepare_files_for_prompt with auto-detected mime type."""
-    # Create a minimal PNG file
-    test_file = tmp_path / "test.png"
-    png_data = (
-        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
-        b"\x00\x00\x00\x01\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx"
-        b"\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82"
-    )
-    test_file.write_bytes(png_data)
-
     # Pass None as mime_type to trigger auto-detection
-    result = await _async_prepare_files_for_prompt([(test_file, None)])
+    result = await _async_prepare_files_for_prompt([(tiny_png, None)])
 
     assert len(result) == 1
     assert result[0]["type"] == "image_url"
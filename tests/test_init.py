@@ -1,12 +1,15 @@
 """Tests for the Perplexity integration."""
 
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import MagicMock, Mock
 
+import pytest
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.core import HomeAssistant
 from perplexity import AuthenticationError, PerplexityError
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from tests import setup_integration
+
 
 async def test_async_setup_entry_success(
     hass: HomeAssistant,
@@ -18,44 +21,29 @@ async def test_async_setup_entry_success(
     assert mock_setup_entry.runtime_data is mock_perplexity_client
 
 
-async def test_async_setup_entry_auth_error(
-    hass: HomeAssistant,
-    mock_config_entry: MockConfigEntry,
-    mock_perplexity_client: MagicMock,
-) -> None:
-    """Test setup entry with authentication error."""
-    mock_perplexity_client.chat.completions.create.side_effect = AuthenticationError(
-        "Invalid API key", response=Mock(), body=None
-    )
-
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        await hass.config_entries.async_setup(mock_config_entry.entry_id)
-        await hass.async_block_till_done()
-
-    assert mock_config_entry.state is ConfigEntryState.SETUP_ERROR
-
-
-async def test_async_setup_entry_connection_error(
+@pytest.mark.parametrize(
+    ("exception", "state"),
+    [
+        (
+            AuthenticationError("Invalid API key", response=Mock(), body=None),
+            ConfigEntryState.SETUP_ERROR,
+        ),
+        (PerplexityError("Connection error"), ConfigEntryState.SETUP_RETRY),
+    ],
+)
+async def test_async_setup_entry_errors(
     hass: HomeAssistant,
     mock_config_entry: MockConfigEntry,
     mock_perplexity_client: MagicMock,
+    exception: Exception,
+    state: ConfigEntryState,
 ) -> None:
-    """Test setup entry with connection error."""
-    mock_perplexity_client.chat.completions.create.side_effect = PerplexityError(
-        "Connection error"
-    )
+    """Test setup entry with authentication and connection errors."""
+    mock_perplexity_client.chat.completions.create.side_effect = exception
 
-    with patch(
-        "custom_components.perplexity.AsyncPerplexity",
-        return_value=mock_perplexity_client,
-    ):
-        await hass.config_entries.async_setup(mock_config_entry.entry_id)
-        await hass.async_block_till_done()
+    await setup_integration(hass, mock_config_entry)
 
-    assert mock_config_entry.state is ConfigEntryState.SETUP_RETRY
+    assert mock_config_entry.state is state
 
 
 async def test_async_unload_entry(
@@ -66,7 +54,6 @@ async def test_async_unload_entry(
     assert mock_setup_entry.state is ConfigEntryState.LOADED
 
     assert await hass.config_entries.async_unload(mock_setup_entry.entry_id)
-    await hass.async_block_till_done()
 
     assert mock_setup_entry.state is ConfigEntryState.NOT_LOADED
 